@@ -3,17 +3,38 @@
 Project Sync Tool - Sync projects between Macs using Git and rsync
 """
 
+import atexit
+import collections
+import concurrent.futures
 import json
 import os
+import re
+import shlex
+import shutil
+import signal
 import subprocess
 import sys
+import tempfile
 import threading
+import traceback
 from pathlib import Path
 
+try:
+    import pty
+except ImportError:
+    # Not available on Windows
+    pty = None
+
+try:
+    # Optional: C-implemented JSON, used for config/cache files when installed
+    import orjson
+except ImportError:
+    orjson = None
+
 # Check for tkinter before importing
 try:
     import tkinter as tk
-    from tkinter import ttk, messagebox, filedialog, simpledialog
+    from tkinter import ttk, messagebox
 except ImportError:
     # Show error without tkinter
     print("=" * 60)
@@ -45,43 +66,148 @@ SCRIPT_DIR = Path(__file__).parent.resolve()
 APP_DIR = SCRIPT_DIR.parent  # One level up from src/
 CONFIG_FILE = APP_DIR / "config.json"
 
+# Seconds a streamed git push/pull/clone may take; also rsync's
+# allowance for a stalled connection (--timeout, an idle limit)
+NETWORK_TIMEOUT = 120
+
+# Separates the sections of a _run_remote_script output
+REMOTE_SCRIPT_SENTINEL = "--- projectsync ---"
+
+# Aggregate progress from `rsync --info=progress2`: files left to check / total
+RSYNC_PROGRESS_RE = re.compile(r'to-chk=(\d+)/(\d+)')
+
+
+# Dialog positions centered on the main window: {(dialog class, parent id): (x, y)}.
+# Cleared whenever the main window moves or resizes.
+_GEO_CACHE = {}
+
+
+def _center_on_parent(window, parent):
+    """Center a dialog over parent, reusing the last position for dialogs
+    of the main window so reopening one skips the layout pass"""
+    key = (type(window).__name__, id(parent))
+    cacheable = isinstance(parent, tk.Tk)
+    if cacheable and key in _GEO_CACHE:
+        x, y = _GEO_CACHE[key]
+        window.geometry(f"+{x}+{y}")
+        return
+
+    window.update_idletasks()
+    x = parent.winfo_x() + (parent.winfo_width() - window.winfo_width()) // 2
+    y = parent.winfo_y() + (parent.winfo_height() - window.winfo_height()) // 2
+    window.geometry(f"+{x}+{y}")
+    if cacheable:
+        _GEO_CACHE[key] = (x, y)
+
+
+def _read_json(path):
+    """Load a JSON file (raises IOError / json.JSONDecodeError like json.load)"""
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    """Write JSON to a temp file next to path and rename it into place,
+    so a crash mid-write can't leave a truncated file behind"""
+    fd, temp_file = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}-", suffix=".json")
+    try:
+        if orjson is not None:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, indent=2)
+        os.replace(temp_file, path)
+    except BaseException:
+        os.unlink(temp_file)
+        raise
+
+
+def _quote_remote_path(path):
+    """shlex.quote a remote path, leaving a leading ~ for the remote shell to expand
+
+    rsync's host:path syntax expands ~ too, so git and rsync agree on
+    where ~/projects/app is.
+    """
+    if path == "~":
+        return path
+    if path.startswith("~/"):
+        return "~/" + shlex.quote(path[2:])
+    return shlex.quote(path)
+
 
 class Config:
     """Manage project configurations"""
 
     def __init__(self):
         self.projects = []
+        self._dirty = False
+        self._names_cache = None
+        self._by_name = {}
         self.load()
 
     def load(self):
         if CONFIG_FILE.exists():
             try:
-                with open(CONFIG_FILE, 'r') as f:
-                    data = json.load(f)
-                    self.projects = data.get('projects', [])
+                data = _read_json(CONFIG_FILE)
+                self.projects = data.get('projects', [])
             except (json.JSONDecodeError, IOError):
                 self.projects = []
         else:
             self.projects = []
+        self._dirty = False
+        self._names_cache = None
+        self._reindex()
+
+    def _reindex(self):
+        # name -> index; the first project wins if names repeat
+        self._by_name = {}
+        for i, p in enumerate(self.projects):
+            self._by_name.setdefault(p['name'], i)
 
     def save(self):
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump({'projects': self.projects}, f, indent=2)
+        _write_json(CONFIG_FILE, {'projects': self.projects})
+        self._dirty = False
+
+    def flush(self):
+        """Save only if there are unsaved changes"""
+        if self._dirty:
+            self.save()
+
+    def _changed(self):
+        # Mutations only mark the config dirty; SyncApp flushes it (debounced)
+        self._dirty = True
+        self._names_cache = None
+        self._reindex()
 
     def add_project(self, project):
         self.projects.append(project)
-        self.save()
+        self._changed()
 
     def update_project(self, index, project):
         self.projects[index] = project
-        self.save()
+        self._changed()
 
     def remove_project(self, index):
         del self.projects[index]
-        self.save()
+        self._changed()
+
+    def find_index(self, name):
+        """Index of the project with this name, or None"""
+        return self._by_name.get(name)
+
+    def get(self, name):
+        """Project with this name, or None"""
+        index = self._by_name.get(name)
+        return None if index is None else self.projects[index]
 
     def get_project_names(self):
-        return [p['name'] for p in self.projects]
+        if self._names_cache is None:
+            self._names_cache = [p['name'] for p in self.projects]
+        return self._names_cache
 
 
 class ProjectDialog(tk.Toplevel):
@@ -105,10 +231,7 @@ class ProjectDialog(tk.Toplevel):
         self.wait_window(self)
 
     def _center_window(self, parent):
-        self.update_idletasks()
-        x = parent.winfo_x() + (parent.winfo_width() - self.winfo_width()) // 2
-        y = parent.winfo_y() + (parent.winfo_height() - self.winfo_height()) // 2
-        self.geometry(f"+{x}+{y}")
+        _center_on_parent(self, parent)
 
     def _create_widgets(self):
         frame = ttk.Frame(self, padding=20)
@@ -153,6 +276,8 @@ class ProjectDialog(tk.Toplevel):
         frame.columnconfigure(1, weight=1)
 
     def _browse_local(self):
+        # Imported on first use - most sessions never open the folder picker
+        from tkinter import filedialog
         path = filedialog.askdirectory(title="Select Local Project Folder")
         if path:
             self.local_var.set(path)
@@ -202,10 +327,7 @@ class CommitDialog(tk.Toplevel):
         self.wait_window(self)
 
     def _center_window(self, parent):
-        self.update_idletasks()
-        x = parent.winfo_x() + (parent.winfo_width() - self.winfo_width()) // 2
-        y = parent.winfo_y() + (parent.winfo_height() - self.winfo_height()) // 2
-        self.geometry(f"+{x}+{y}")
+        _center_on_parent(self, parent)
 
     def _create_widgets(self, changes_summary):
         frame = ttk.Frame(self, padding=20)
@@ -245,6 +367,9 @@ class CommitDialog(tk.Toplevel):
 class SSHSetupDialog(tk.Toplevel):
     """Dialog to help users set up SSH keys"""
 
+    # Public key text shared across dialog opens: {path: (mtime, text)}
+    _key_cache = {}
+
     def __init__(self, parent):
         super().__init__(parent)
         self.title("SSH Setup Helper")
@@ -261,10 +386,7 @@ class SSHSetupDialog(tk.Toplevel):
         self._load_ssh_info()
 
     def _center_window(self, parent):
-        self.update_idletasks()
-        x = parent.winfo_x() + (parent.winfo_width() - self.winfo_width()) // 2
-        y = parent.winfo_y() + (parent.winfo_height() - self.winfo_height()) // 2
-        self.geometry(f"+{x}+{y}")
+        _center_on_parent(self, parent)
 
     def _create_widgets(self):
         frame = ttk.Frame(self, padding=20)
@@ -338,6 +460,22 @@ class SSHSetupDialog(tk.Toplevel):
         # Close button
         ttk.Button(frame, text="Close", command=self.destroy).pack(pady=(15,0))
 
+    def _read_key(self, key_path):
+        """Return a key file's text, re-reading it only if its mtime changed (None if missing)"""
+        try:
+            mtime = key_path.stat().st_mtime
+        except FileNotFoundError:
+            self._key_cache.pop(key_path, None)
+            return None
+
+        cached = self._key_cache.get(key_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        text = key_path.read_text().strip()
+        self._key_cache[key_path] = (mtime, text)
+        return text
+
     def _load_ssh_info(self):
         # Check for existing SSH keys
         home = Path.home()
@@ -348,15 +486,15 @@ class SSHSetupDialog(tk.Toplevel):
 
         pub_key = None
         for key_path in key_paths:
-            if key_path.exists():
-                try:
-                    pub_key = key_path.read_text().strip()
-                    self.key_status_label.config(
-                        text=f"Found: {key_path.name}", foreground="green"
-                    )
-                    break
-                except:
-                    pass
+            try:
+                pub_key = self._read_key(key_path)
+            except (OSError, ValueError):
+                continue
+            if pub_key:
+                self.key_status_label.config(
+                    text=f"Found: {key_path.name}", foreground="green"
+                )
+                break
 
         if pub_key:
             self.key_text.delete("1.0", tk.END)
@@ -402,6 +540,7 @@ class SSHSetupDialog(tk.Toplevel):
                 capture_output=True, text=True
             )
             if result.returncode == 0:
+                self._key_cache.pop(key_path.with_suffix(".pub"), None)
                 messagebox.showinfo("Success", "SSH key generated successfully!")
                 self._load_ssh_info()
             else:
@@ -421,7 +560,16 @@ class SSHSetupDialog(tk.Toplevel):
             messagebox.showerror("Error", "No SSH key found. Generate one first.")
             return
 
-        # Run ssh-copy-id in Terminal so user can enter password
+        # Run ssh-copy-id in a pseudo-terminal and relay its prompts here
+        if pty is not None and shutil.which("ssh-copy-id"):
+            SSHCopyIdDialog(self, remote)
+            return
+
+        if sys.platform != "darwin":
+            messagebox.showerror("Error", "ssh-copy-id not found. Copy the key manually (see below).")
+            return
+
+        # Fall back to running ssh-copy-id in Terminal so user can enter password
         try:
             # Use AppleScript to open Terminal and run ssh-copy-id
             applescript = f'''
@@ -439,6 +587,126 @@ class SSHSetupDialog(tk.Toplevel):
             messagebox.showerror("Error", f"Failed to open Terminal:\n{e}")
 
 
+class SSHCopyIdDialog(tk.Toplevel):
+    """Run ssh-copy-id in a pseudo-terminal, showing its output and relaying prompts"""
+
+    def __init__(self, parent, remote):
+        super().__init__(parent)
+        self.title(f"Send Key to {remote}")
+        self.parent = parent
+
+        self.transient(parent)
+        self.grab_set()
+
+        self.geometry("520x340")
+        self.resizable(False, False)
+
+        self._create_widgets()
+        self._center_window(parent)
+        self.protocol("WM_DELETE_WINDOW", self._close)
+
+        self.pid, self.fd = self._spawn(["ssh-copy-id", remote])
+        threading.Thread(target=self._read_output, daemon=True).start()
+
+    def _center_window(self, parent):
+        _center_on_parent(self, parent)
+
+    def _create_widgets(self):
+        frame = ttk.Frame(self, padding=15)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        self.output_text = tk.Text(frame, height=12, width=60, wrap=tk.WORD, state=tk.DISABLED,
+                                   bg="#2d2d2d", fg="#ffffff", relief=tk.FLAT)
+        self.output_text.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(frame, text="Answer prompts here (password, yes/no):").pack(anchor="w", pady=(10,5))
+
+        input_frame = ttk.Frame(frame)
+        input_frame.pack(fill=tk.X)
+        self.input_var = tk.StringVar()
+        self.input_entry = ttk.Entry(input_frame, textvariable=self.input_var, width=40)
+        self.input_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.input_entry.bind("<Return>", lambda e: self._send())
+        self.input_entry.focus_set()
+        ttk.Button(input_frame, text="Send", command=self._send).pack(side=tk.LEFT, padx=(10,0))
+
+        self.status_label = ttk.Label(frame, text="Running ssh-copy-id...", foreground="blue")
+        self.status_label.pack(anchor="w", pady=(10,0))
+
+        ttk.Button(frame, text="Close", command=self._close).pack(pady=(10,0))
+
+    def _spawn(self, argv):
+        """Fork argv onto a new pty; returns (pid, master fd)"""
+        pid, fd = pty.fork()
+        if pid == 0:
+            # Child: replace ourselves with the command
+            try:
+                os.execvp(argv[0], argv)
+            finally:
+                os._exit(127)
+        return pid, fd
+
+    def _read_output(self):
+        """Reader thread: forward pty output to the Tk thread until the child exits"""
+        while True:
+            try:
+                data = os.read(self.fd, 1024)
+            except OSError:
+                # EIO once the child has closed its side of the pty
+                break
+            if not data:
+                break
+            self._post(self._append_output, data.decode('utf-8', 'replace'))
+
+        _, status = os.waitpid(self.pid, 0)
+        self.pid = None
+        os.close(self.fd)
+        self._post(self._finished, os.waitstatus_to_exitcode(status))
+
+    def _post(self, func, *args):
+        try:
+            self.after(0, func, *args)
+        except (tk.TclError, RuntimeError):
+            # Dialog already closed
+            pass
+
+    def _append_output(self, text):
+        self.output_text.config(state=tk.NORMAL)
+        self.output_text.insert(tk.END, text.replace('\r', ''))
+        self.output_text.see(tk.END)
+        self.output_text.config(state=tk.DISABLED)
+
+        # Hide what's typed when the pending prompt asks for a password
+        last_line = self.output_text.get("end-1c linestart", "end-1c").strip().lower()
+        self.input_entry.config(show="*" if last_line.endswith("password:") else "")
+
+    def _send(self):
+        if self.pid is None:
+            return
+        answer = self.input_var.get()
+        self.input_var.set("")
+        try:
+            os.write(self.fd, (answer + "\n").encode())
+        except OSError:
+            pass
+
+    def _finished(self, exit_code):
+        if exit_code == 0:
+            self.status_label.config(text="✓ SSH key copied successfully!", foreground="green")
+        else:
+            self.status_label.config(text=f"ssh-copy-id failed (exit code {exit_code})", foreground="red")
+
+    def _close(self):
+        if self.pid is not None:
+            try:
+                os.kill(self.pid, signal.SIGTERM)
+            except OSError:
+                pass
+        self.destroy()
+        # Hand the modal grab back to the setup dialog
+        self.parent.grab_set()
+
+
 class SyncApp(tk.Tk):
     """Main application window"""
 
@@ -446,14 +714,41 @@ class SyncApp(tk.Tk):
         super().__init__()
 
         self.title("Project Sync Tool")
-        self.geometry("580x440")
+        self.geometry("580x460")
         self.resizable(False, False)
 
         self.settings = Config()
         self.current_project = None
+        self._config_flush_id = None
+        atexit.register(self.settings.flush)
+        # Parsed `git status` per local path: {cwd: (index_mtime, state)}
+        self._git_state_cache = {}
+        # Gitignored file listing per local path, kept for one operation: {cwd: files}
+        self._untracked_cache = {}
+        # Subprocess work runs here so the Tk event loop never blocks
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        # Set once the window is going away; workers stop talking to Tk
+        self._closing = False
+        # Operations in flight; the UI stays locked until it drops to 0
+        self._busy = 0
+
+        # Shared ssh connections: one master per host, every ssh/rsync call
+        # rides its socket. Kept under /tmp because macOS's $TMPDIR is long
+        # enough to push the socket path past the 104-byte limit.
+        self._ssh_ctrl_dir = Path(tempfile.mkdtemp(
+            prefix="projectsync-ssh-", dir="/tmp" if os.path.isdir("/tmp") else None
+        ))
+        self._ssh_opts = ["-o", f"ControlPath={self._ssh_ctrl_dir}/%C"]
+        self._ssh_hosts = set()
+        self._ssh_master_lock = threading.Lock()
+        atexit.register(self._close_ssh_masters)
+
+        # Local rsync features, probed on first sync (see _get_rsync_caps)
+        self._rsync_caps = None
 
         self._create_widgets()
         self._update_project_list()
+        self.bind("<Configure>", self._on_configure)
 
         # Center window on screen
         self.update_idletasks()
@@ -475,7 +770,8 @@ class SyncApp(tk.Tk):
         self.project_combo.pack(side=tk.LEFT, padx=(10,10))
         self.project_combo.bind("<<ComboboxSelected>>", self._on_project_selected)
 
-        ttk.Button(selector_frame, text="Test SSH", command=self._test_connection).pack(side=tk.RIGHT)
+        test_ssh_btn = ttk.Button(selector_frame, text="Test SSH", command=self._test_connection)
+        test_ssh_btn.pack(side=tk.RIGHT)
 
         # Project info display
         info_frame = ttk.LabelFrame(main_frame, text="Project Details", padding=10)
@@ -506,13 +802,22 @@ class SyncApp(tk.Tk):
         self.git_push_btn = ttk.Button(ops_frame, text="Git Push + Remote Pull", command=self._git_push_and_remote_pull)
         self.git_push_btn.pack(fill=tk.X)
 
+        # Buttons that need a selected project; toggled by _set_buttons_state
+        self._toggle_buttons = [self.full_sync_btn, self.sync_files_btn, self.git_push_btn]
+        self._buttons_enabled = None
+
         # Project management buttons
         mgmt_frame = ttk.Frame(main_frame)
         mgmt_frame.pack(fill=tk.X, pady=(10,0))
 
-        ttk.Button(mgmt_frame, text="+ Add Project", command=self._add_project).pack(side=tk.LEFT, padx=(0,5))
-        ttk.Button(mgmt_frame, text="Edit Project", command=self._edit_project).pack(side=tk.LEFT, padx=5)
-        ttk.Button(mgmt_frame, text="Remove", command=self._remove_project).pack(side=tk.LEFT, padx=5)
+        add_btn = ttk.Button(mgmt_frame, text="+ Add Project", command=self._add_project)
+        add_btn.pack(side=tk.LEFT, padx=(0,5))
+        edit_btn = ttk.Button(mgmt_frame, text="Edit Project", command=self._edit_project)
+        edit_btn.pack(side=tk.LEFT, padx=5)
+        remove_btn = ttk.Button(mgmt_frame, text="Remove", command=self._remove_project)
+        remove_btn.pack(side=tk.LEFT, padx=5)
+        # Disabled only while an operation runs (see _set_busy)
+        self._busy_buttons = [test_ssh_btn, add_btn, edit_btn, remove_btn]
         ttk.Button(mgmt_frame, text="SSH Setup", command=self._ssh_setup).pack(side=tk.RIGHT)
 
         # Status bar
@@ -520,12 +825,42 @@ class SyncApp(tk.Tk):
         self.status_var = tk.StringVar(value="Ready")
         self.status_label = ttk.Label(main_frame, textvariable=self.status_var, foreground="gray")
         self.status_label.pack(anchor="w")
+        # Packed only while rsync reports progress (see _set_progress)
+        self.progress = ttk.Progressbar(main_frame, mode="determinate", maximum=1.0)
 
         self._set_buttons_state(False)
 
+    def _on_configure(self, event):
+        # Child widgets report here too; only the window itself moving matters
+        if event.widget is self:
+            _GEO_CACHE.clear()
+
+    def destroy(self):
+        self._closing = True
+        # Drop queued work; a running command finishes on its own, but can
+        # no longer reach the (gone) UI - see _post and _ui
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._flush_config()
+        super().destroy()
+
+    def _schedule_config_flush(self):
+        """Save config.json 500 ms after the last change"""
+        if self._config_flush_id is not None:
+            self.after_cancel(self._config_flush_id)
+        self._config_flush_id = self.after(500, self._flush_config)
+
+    def _flush_config(self):
+        self._config_flush_id = None
+        self.settings.flush()
+
     def _set_buttons_state(self, enabled):
+        # Each config() is a Tcl round-trip, so skip it when nothing changes
+        if enabled == self._buttons_enabled:
+            return
+        self._buttons_enabled = enabled
+
         state = "normal" if enabled else "disabled"
-        for btn in [self.full_sync_btn, self.sync_files_btn, self.git_push_btn]:
+        for btn in self._toggle_buttons:
             btn.config(state=state)
 
     def _update_project_list(self):
@@ -536,31 +871,82 @@ class SyncApp(tk.Tk):
             self._on_project_selected(None)
 
     def _on_project_selected(self, event):
-        name = self.project_var.get()
-        for p in self.settings.projects:
-            if p['name'] == name:
-                self.current_project = p
-                self.local_label.config(text=f"Local:  {p['local_path']}")
-                self.remote_label.config(text=f"Remote: {p['remote_host']}:{p['remote_path']}")
-                self.branch_label.config(text=f"Branch: {p['git_branch']}")
-                self._set_buttons_state(True)
-                return
+        p = self.settings.get(self.project_var.get())
+        if p:
+            self.current_project = p
+            self.local_label.config(text=f"Local:  {p['local_path']}")
+            self.remote_label.config(text=f"Remote: {p['remote_host']}:{p['remote_path']}")
+            self.branch_label.config(text=f"Branch: {p['git_branch']}")
+            self._set_buttons_state(True)
+            # Open the connection now so the first sync doesn't pay the handshake
+            self._executor.submit(self._ensure_ssh_master, p['remote_host'])
+            return
 
         self.current_project = None
         self._set_buttons_state(False)
 
     def _set_status(self, msg, color="gray"):
+        if threading.current_thread() is not threading.main_thread():
+            # Called from a worker - hand the update to the Tk thread
+            self._post(self._set_status, msg, color)
+            return
         self.status_var.set(msg)
         self.status_label.config(foreground=color)
         self.update_idletasks()
 
-    def _run_command(self, cmd, cwd=None):
-        """Run a shell command and return (success, output)"""
+    def _post(self, func, *args):
+        """Schedule func on the Tk thread; dropped once the window is closing"""
+        if self._closing:
+            return
+        try:
+            self.after(0, func, *args)
+        except (tk.TclError, RuntimeError):
+            # Window destroyed between the check and the call
+            pass
+
+    def _ui(self, func, *args, **kwargs):
+        """Call func on the Tk thread and return its result.
+
+        Lets worker-thread code show message boxes and dialogs; blocks the
+        worker until the user has answered.
+        """
+        if threading.current_thread() is threading.main_thread():
+            return func(*args, **kwargs)
+
+        future = concurrent.futures.Future()
+
+        def call():
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+        self._post(call)
+        # Poll so a worker doesn't wait forever on a call the closing
+        # window will never run
+        while True:
+            try:
+                return future.result(timeout=0.5)
+            except concurrent.futures.TimeoutError:
+                if self._closing:
+                    raise RuntimeError("Window closed")
+
+    def _run_command(self, argv, cwd=None, text=True, input=None):
+        """Run a command (argv list, no shell) and return (success, output)
+
+        With text=False a successful run returns stdout as raw bytes and
+        stderr is dropped; on failure output is still an error string.
+        input, if given, is fed to the command's stdin.
+        """
         try:
             result = subprocess.run(
-                cmd, shell=True, cwd=cwd,
-                capture_output=True, text=True, timeout=120
+                argv, cwd=cwd, input=input,
+                capture_output=True, text=text, timeout=120
             )
+            if not text:
+                if result.returncode == 0:
+                    return True, result.stdout
+                return False, result.stderr.decode('utf-8', 'replace').strip()
             output = result.stdout + result.stderr
             return result.returncode == 0, output.strip()
         except subprocess.TimeoutExpired:
@@ -568,30 +954,187 @@ class SyncApp(tk.Tk):
         except Exception as e:
             return False, str(e)
 
+    def _run_command_streaming(self, argv, cwd=None, on_line=None, input=None, timeout=None):
+        """Run a long command, passing each output line to on_line as it arrives.
+
+        Returns (success, output) like _run_command, but output only keeps
+        the last lines - enough for an error message. If input is given it
+        is fed to the command's stdin (str, or bytes to write it as-is).
+        After timeout seconds the command (and anything it started) is killed.
+        """
+        tail = collections.deque(maxlen=200)
+        # In its own process group a timeout also takes down children, e.g.
+        # the ssh a hung `git push` is waiting on, which hold our pipe open
+        own_group = timeout is not None and hasattr(os, 'killpg')
+        try:
+            proc = subprocess.Popen(
+                argv, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                stdin=None if input is None else subprocess.PIPE,
+                text=True, errors='replace', bufsize=1, start_new_session=own_group
+            )
+        except Exception as e:
+            return False, str(e)
+
+        expired = threading.Event()
+        timer = None
+        if timeout is not None:
+            def expire():
+                expired.set()
+                try:
+                    if own_group:
+                        os.killpg(proc.pid, signal.SIGKILL)
+                    else:
+                        proc.kill()
+                except OSError:
+                    pass  # Already gone
+            timer = threading.Timer(timeout, expire)
+            timer.daemon = True
+            timer.start()
+
+        if input is not None:
+            # Write from a side thread: a big input could fill the pipe while
+            # the command is blocked on us draining its output
+            def feed():
+                try:
+                    if isinstance(input, bytes):
+                        proc.stdin.buffer.write(input)
+                    else:
+                        proc.stdin.write(input)
+                    proc.stdin.close()
+                except OSError:
+                    pass  # Command exited early; its output says why
+            threading.Thread(target=feed, daemon=True).start()
+
+        try:
+            with proc:
+                for line in iter(proc.stdout.readline, ''):
+                    line = line.rstrip()
+                    if line:
+                        tail.append(line)
+                        if on_line:
+                            on_line(line)
+        except Exception as e:
+            proc.kill()
+            return False, str(e)
+        finally:
+            if timer:
+                timer.cancel()
+        if expired.is_set():
+            return False, "Command timed out"
+        return proc.returncode == 0, '\n'.join(tail)
+
+    def _stream_to_status(self, line):
+        """on_line callback for _run_command_streaming: show the line in the status bar"""
+        self._set_status(line, "blue")
+
+    def _stream_rsync_progress(self, line):
+        """on_line callback for rsync: drive the progress bar from progress2 lines"""
+        match = RSYNC_PROGRESS_RE.search(line)
+        if match:
+            remaining, total = int(match.group(1)), int(match.group(2))
+            self._set_progress((total - remaining) / total if total else 1.0)
+        else:
+            self._set_status(line, "blue")
+
+    def _set_progress(self, value):
+        """Show the progress bar at value (0-1), or hide it with None"""
+        if threading.current_thread() is not threading.main_thread():
+            self._post(self._set_progress, value)
+            return
+        if value is None:
+            self.progress.pack_forget()
+        else:
+            if not self.progress.winfo_ismapped():
+                self.progress.pack(fill=tk.X, pady=(5,0))
+            self.progress['value'] = value
+
+    def _get_rsync_caps(self):
+        """Probe the local rsync once for optional features"""
+        if self._rsync_caps is None:
+            success, output = self._run_command(["rsync", "--version"])
+            match = re.search(r'version (\d+)\.(\d+)', output) if success else None
+            version = (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+            # macOS ships rsync 2.6.9 / openrsync, which predate --info
+            self._rsync_caps = {'progress2': version >= (3, 1)}
+        return self._rsync_caps
+
+    def _ssh(self, host, remote_cmd, *options):
+        """argv for running remote_cmd on host over the shared connection"""
+        return ["ssh", *self._ssh_opts, *options, host, remote_cmd]
+
+    def _ensure_ssh_master(self, host):
+        """Start a background master connection to host unless one is up.
+
+        Clients only set ControlPath, so if this fails (e.g. the host needs
+        a password) they fall back to connecting directly.
+        """
+        # Serialized: two masters racing for one socket would leave the
+        # loser running as a plain -N connection that never exits
+        with self._ssh_master_lock:
+            try:
+                check = subprocess.run(["ssh", *self._ssh_opts, "-O", "check", host],
+                                       capture_output=True, timeout=10)
+                if check.returncode == 0:
+                    return
+                # -f backgrounds once authenticated; the master must not inherit
+                # our pipes or it would hold them open for ControlPersist seconds
+                subprocess.run(
+                    ["ssh", *self._ssh_opts, "-o", "ControlMaster=yes", "-o", "ControlPersist=600",
+                     "-o", "BatchMode=yes", "-o", "ConnectTimeout=10", "-fN", host],
+                    stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                    timeout=30
+                )
+                self._ssh_hosts.add(host)
+            except (subprocess.TimeoutExpired, OSError):
+                pass
+
+    def _close_ssh_masters(self):
+        """Stop the master connections and remove their sockets"""
+        for host in list(self._ssh_hosts):
+            try:
+                subprocess.run(["ssh", *self._ssh_opts, "-O", "exit", host],
+                               capture_output=True, timeout=10)
+            except (subprocess.TimeoutExpired, OSError):
+                pass
+        self._ssh_hosts.clear()
+        shutil.rmtree(self._ssh_ctrl_dir, ignore_errors=True)
+
+    def _run_command_async(self, argv, cwd=None, on_done=None):
+        """Run a command on the worker pool; on_done(success, output) runs on the Tk thread"""
+        future = self._executor.submit(self._run_command, argv, cwd)
+        if on_done:
+            future.add_done_callback(lambda f: self._post(on_done, *f.result()))
+        return future
+
+    def _run_parallel(self, *calls):
+        """Run independent zero-argument callables on the pool; return their results in order.
+
+        Must not be nested: a call that itself uses _run_parallel could wait
+        on a worker that never frees up.
+        """
+        futures = [self._executor.submit(call) for call in calls]
+        return [f.result() for f in futures]
+
     def _run_in_thread(self, func, callback=None):
-        """Run a function in a background thread to keep UI responsive"""
+        """Run a function on the worker pool to keep UI responsive"""
         self._set_busy(True)
 
-        def thread_target():
+        def done(future):
             try:
-                result = func()
+                result = future.result()
+            except concurrent.futures.CancelledError:
+                return  # Dropped by destroy(); there is no UI left to update
             except Exception as e:
+                # A bug or a closed window - not a failure the steps already
+                # reported, so log it and tell the user instead of going quiet
+                traceback.print_exception(type(e), e, e.__traceback__)
+                self._post(self._set_status, f"Unexpected error: {e}", "red")
+                self._post(messagebox.showerror, "Error", f"Unexpected error:\n{e}")
                 result = False
-            finally:
-                # Schedule callback on main thread
-                self.after(0, lambda: self._thread_done(result, callback))
-
-        thread = threading.Thread(target=thread_target, daemon=True)
-        thread.start()
-
-        # Keep UI responsive while thread runs
-        self._poll_thread(thread)
+            # Schedule callback on main thread
+            self._post(self._thread_done, result, callback)
 
-    def _poll_thread(self, thread):
-        """Poll thread and keep UI responsive"""
-        if thread.is_alive():
-            self.update_idletasks()
-            self.after(50, lambda: self._poll_thread(thread))
+        self._executor.submit(func).add_done_callback(done)
 
     def _thread_done(self, result, callback):
         """Called when background thread completes"""
@@ -600,14 +1143,27 @@ class SyncApp(tk.Tk):
             callback(result)
 
     def _set_busy(self, busy):
-        """Set busy state - disable buttons and show wait cursor"""
-        if busy:
+        """Set busy state - disable buttons and show wait cursor
+
+        Calls nest: one operation finishing doesn't unlock the UI while
+        another is still running.
+        """
+        self._busy += 1 if busy else -1
+        if busy and self._busy == 1:
             self.config(cursor="watch")
+            self.project_combo.config(state="disabled")
             self._set_buttons_state(False)
-        else:
+            for btn in self._busy_buttons:
+                btn.config(state="disabled")
+        elif not busy and self._busy == 0:
             self.config(cursor="")
+            self.project_combo.config(state="readonly")
             if self.current_project:
                 self._set_buttons_state(True)
+            for btn in self._busy_buttons:
+                btn.config(state="normal")
+        else:
+            return
         self.update_idletasks()
 
     def _ssh_setup(self):
@@ -620,26 +1176,34 @@ class SyncApp(tk.Tk):
             return
 
         self._set_status("Testing SSH connection...", "blue")
+        self._set_busy(True)
         host = self.current_project['remote_host']
 
-        # Test SSH connection
-        success, output = self._run_command(f'ssh -o ConnectTimeout=10 -o BatchMode=yes {host} "echo connected"')
-
-        if success and "connected" in output:
-            self._set_status("Connection successful!", "green")
-            messagebox.showinfo("Success", f"Successfully connected to {host}")
-        else:
-            self._set_status("Connection failed", "red")
-            messagebox.showerror("Connection Failed",
-                f"Could not connect to {host}\n\nMake sure:\n"
-                "1. SSH keys are set up for passwordless login\n"
-                "2. The host is reachable\n"
-                f"3. The host alias exists in ~/.ssh/config\n\nError: {output}")
+        def on_done(success, output):
+            self._set_busy(False)
+            if success and "connected" in output:
+                self._set_status("Connection successful!", "green")
+                messagebox.showinfo("Success", f"Successfully connected to {host}")
+            else:
+                self._set_status("Connection failed", "red")
+                messagebox.showerror("Connection Failed",
+                    f"Could not connect to {host}\n\nMake sure:\n"
+                    "1. SSH keys are set up for passwordless login\n"
+                    "2. The host is reachable\n"
+                    f"3. The host alias exists in ~/.ssh/config\n\nError: {output}")
+
+        # Test SSH connection - opening the master first means later
+        # git/rsync calls reuse this connection
+        argv = self._ssh(host, "echo connected", "-o", "ConnectTimeout=10", "-o", "BatchMode=yes")
+        self._executor.submit(self._ensure_ssh_master, host).add_done_callback(
+            lambda f: self._run_command_async(argv, on_done=on_done)
+        )
 
     def _add_project(self):
         dialog = ProjectDialog(self, "Add Project")
         if dialog.result:
             self.settings.add_project(dialog.result)
+            self._schedule_config_flush()
             self._update_project_list()
             # Select the new project
             self.project_var.set(dialog.result['name'])
@@ -651,19 +1215,14 @@ class SyncApp(tk.Tk):
             messagebox.showerror("Error", "No project selected")
             return
 
-        # Find index
-        index = None
-        for i, p in enumerate(self.settings.projects):
-            if p['name'] == self.current_project['name']:
-                index = i
-                break
-
+        index = self.settings.find_index(self.current_project['name'])
         if index is None:
             return
 
         dialog = ProjectDialog(self, "Edit Project", self.current_project)
         if dialog.result:
             self.settings.update_project(index, dialog.result)
+            self._schedule_config_flush()
             self._update_project_list()
             self.project_var.set(dialog.result['name'])
             self._on_project_selected(None)
@@ -677,10 +1236,10 @@ class SyncApp(tk.Tk):
         if not messagebox.askyesno("Confirm", f"Remove project '{self.current_project['name']}'?"):
             return
 
-        for i, p in enumerate(self.settings.projects):
-            if p['name'] == self.current_project['name']:
-                self.settings.remove_project(i)
-                break
+        index = self.settings.find_index(self.current_project['name'])
+        if index is not None:
+            self.settings.remove_project(index)
+            self._schedule_config_flush()
 
         self.project_var.set("")
         self.current_project = None
@@ -688,54 +1247,180 @@ class SyncApp(tk.Tk):
         self._on_project_selected(None)
         self._set_status("Project removed", "green")
 
-    def _get_git_status(self):
-        """Check if there are uncommitted changes. Returns (is_dirty, summary)"""
-        cwd = self.current_project['local_path']
+    def _git_index_mtime(self, cwd):
+        """mtime of .git/index, or None if it can't be read"""
+        try:
+            return (Path(cwd) / ".git" / "index").stat().st_mtime
+        except OSError:
+            return None
+
+    def _invalidate_git_state(self, cwd):
+        """Forget the cached git status and ignored-file listing for a path"""
+        self._git_state_cache.pop(cwd, None)
+        self._untracked_cache.pop(cwd, None)
+
+    def _parse_git_status(self, output):
+        """Parse `git status --porcelain=v2 --branch -z` output (bytes) into a state dict.
+
+        Changed paths are kept as raw (XY, path) byte pairs; they are only
+        decoded if the summary is actually shown (see _format_git_changes).
+        Ignored paths (from --ignored) are collected under 'ignored'.
+        """
+        state = {'dirty': False, 'branch': None, 'upstream': None, 'ahead': None, 'behind': None,
+                 'oid': None, 'changes': [], 'ignored': []}
+        changes = state['changes']
+        records = iter(output.split(b'\0'))
+        for record in records:
+            if not record:
+                continue
+            kind = record[:1]
+            if kind == b'#':
+                if record.startswith(b'# branch.oid '):
+                    state['oid'] = record[len(b'# branch.oid '):].decode()
+                elif record.startswith(b'# branch.head '):
+                    state['branch'] = record[len(b'# branch.head '):].decode('utf-8', 'replace')
+                elif record.startswith(b'# branch.upstream '):
+                    state['upstream'] = record[len(b'# branch.upstream '):].decode('utf-8', 'replace')
+                elif record.startswith(b'# branch.ab '):
+                    ahead, behind = record[len(b'# branch.ab '):].split()
+                    state['ahead'] = int(ahead)
+                    state['behind'] = -int(behind)
+            elif kind == b'?':
+                changes.append((b'??', record[2:]))
+            elif kind == b'!':
+                state['ignored'].append(record[2:])
+            elif kind in (b'1', b'2', b'u'):
+                # "<kind> <XY> ... <path>", path is the last field
+                fields = record.split(b' ', {b'1': 8, b'2': 9, b'u': 10}[kind])
+                changes.append((fields[1].replace(b'.', b' '), fields[-1]))
+                if kind == b'2':
+                    # Renames/copies carry the original path as an extra record
+                    next(records, None)
+        state['dirty'] = bool(changes)
+        return state
+
+    def _format_git_changes(self, changes):
+        """Render parsed status entries like `git status --short`"""
+        return '\n'.join(f"{xy.decode()} {path.decode('utf-8', 'replace')}" for xy, path in changes)
+
+    def _get_git_state(self, project, with_ignored=False):
+        """Dirty flag, branch and ahead/behind from one `git status` call.
+
+        Returns a dict with keys dirty, branch, upstream, ahead, behind,
+        changes, untracked_all, or None if git status failed. Results are reused while
+        .git/index is unchanged, until `_invalidate_git_state` drops them.
+
+        with_ignored asks the same status call to list ignored files too,
+        seeding the cache _get_gitignored_files reads from. That needs
+        --untracked-files=all, so changes then names every untracked file
+        instead of collapsing new directories; untracked_all is set to say so.
+        """
+        cwd = project['local_path']
+        mtime = self._git_index_mtime(cwd)
+
+        cached = self._git_state_cache.get(cwd)
+        if cached and mtime is not None and cached[0] == mtime:
+            return cached[1]
+
+        argv = ["git", "status", "--porcelain=v2", "--branch", "-z"]
+        with_ignored = with_ignored and cwd not in self._untracked_cache
+        if with_ignored:
+            # Same file set as `git ls-files --others --ignored --exclude-standard`
+            argv += ["--ignored=traditional", "--untracked-files=all"]
+        else:
+            argv.append("--untracked-files=normal")
 
-        success, output = self._run_command("git status --porcelain", cwd=cwd)
+        success, output = self._run_command(argv, cwd=cwd, text=False)
         if not success:
+            return None
+
+        state = self._parse_git_status(output)
+        ignored = state.pop('ignored')
+        state['untracked_all'] = with_ignored
+        if with_ignored:
+            self._untracked_cache[cwd] = ignored
+        # git status may refresh the index, so stat it again for the key
+        mtime = self._git_index_mtime(cwd)
+        if mtime is not None:
+            self._git_state_cache[cwd] = (mtime, state)
+        return state
+
+    def _get_git_status(self, project):
+        """Check if there are uncommitted changes. Returns (is_dirty, summary)"""
+        state = self._get_git_state(project)
+        if state is None:
             return False, "Error checking git status"
+        return state['dirty'], self._format_git_changes(state['changes'])
 
-        is_dirty = bool(output.strip())
-        return is_dirty, output.strip()
-
-    def _git_push_local(self):
-        """Git add, commit (if needed), and push locally"""
-        if not self.current_project:
-            return False
+    def _git_push_local(self, project, on_committed=None):
+        """Git add, commit (if needed), and push locally
 
-        cwd = self.current_project['local_path']
-        branch = self.current_project['git_branch']
+        on_committed is called once there is nothing left to commit, before
+        the push; it isn't called if the commit is cancelled or fails.
+        """
+        cwd = project['local_path']
+        branch = project['git_branch']
 
         self._set_status("Checking for uncommitted changes...", "blue")
 
-        is_dirty, summary = self._get_git_status()
+        state = self._get_git_state(project)
+        if state is None:
+            self._set_status("Git status failed", "red")
+            self._ui(messagebox.showerror, "Error", "Error checking git status")
+            return False
 
-        if is_dirty:
-            dialog = CommitDialog(self, summary)
+        if state['dirty']:
+            changes = state['changes']
+            if state['untracked_all'] and any(xy == b'??' for xy, _ in changes):
+                # Re-list so a new directory shows as one "?? dir/" line, like
+                # plain `git status`, rather than every file inside it
+                success, output = self._run_command(
+                    ["git", "status", "--porcelain=v2", "-z", "--untracked-files=normal"],
+                    cwd=cwd, text=False
+                )
+                if success:
+                    changes = self._parse_git_status(output)['changes']
+            dialog = self._ui(CommitDialog, self, self._format_git_changes(changes))
             if not dialog.result:
                 self._set_status("Push cancelled", "gray")
                 return False
 
             # Commit changes
             self._set_status("Committing changes...", "blue")
-            commit_msg = dialog.result.replace('"', '\\"')
-            success, output = self._run_command(f'git add -A && git commit -m "{commit_msg}"', cwd=cwd)
+            success, output = self._run_command(["git", "add", "-A"], cwd=cwd)
+            if success:
+                success, output = self._run_command(["git", "commit", "-m", dialog.result], cwd=cwd)
             if not success:
                 self._set_status("Commit failed", "red")
-                messagebox.showerror("Error", f"Commit failed:\n{output}")
+                self._ui(messagebox.showerror, "Error", f"Commit failed:\n{output}")
                 return False
+            self._invalidate_git_state(cwd)
+
+        if on_committed:
+            on_committed()
+
+        if (not state['dirty'] and state['branch'] == branch
+                and state['upstream'] == 'origin/' + branch and state['ahead'] == 0):
+            # Clean and nothing ahead of origin/<branch>: the push would be a no-op.
+            # ahead counts against whatever the branch tracks, so only trust it
+            # when that is the ref we push to.
+            self._set_status("Nothing to push", "green")
+            return True
 
         # Push
         self._set_status("Pushing to remote...", "blue")
-        success, output = self._run_command(f"git push origin {branch}", cwd=cwd)
+        success, output = self._run_command_streaming(
+            ["git", "push", "origin", branch], cwd=cwd, on_line=self._stream_to_status,
+            timeout=NETWORK_TIMEOUT
+        )
 
         if success:
+            self._invalidate_git_state(cwd)
             self._set_status("Push successful", "green")
             return True
         else:
             self._set_status("Push failed", "red")
-            messagebox.showerror("Error", f"Push failed:\n{output}")
+            self._ui(messagebox.showerror, "Error", f"Push failed:\n{output}")
             return False
 
     def _convert_to_ssh_url(self, url):
@@ -754,45 +1439,79 @@ class SyncApp(tk.Tk):
         # Non-GitHub URL, return as-is
         return url
 
-    def _check_remote_git_status(self):
+    def _run_remote_script(self, project, script, *options):
+        """Run a multi-command sh script on the remote host in one ssh session.
+
+        The script goes in on stdin (`sh -s`), so nothing needs quoting for
+        the ssh command line. Returns (success, output) like _run_command.
+        """
+        host = project['remote_host']
+        return self._run_command(self._ssh(host, "sh -s", *options), input=script)
+
+    def _probe_remote_repo(self, project):
+        """_check_remote_is_git_repo and _check_remote_git_status in one round trip.
+
+        Returns (is_git_repo, (has_changes, summary)).
+        """
+        remote_path = project['remote_path']
+        script = (f"test -d {_quote_remote_path(remote_path + '/.git')} && echo yes || echo no\n"
+                  f"echo {REMOTE_SCRIPT_SENTINEL}\n"
+                  f"cd {_quote_remote_path(remote_path)} && git status --porcelain\n")
+        success, output = self._run_remote_script(project, script, "-o", "ConnectTimeout=5")
+
+        head, sep, status = output.partition(REMOTE_SCRIPT_SENTINEL + "\n")
+        if not sep:
+            return False, (False, "")
+        is_git_repo = head.strip() == "yes"
+        # A failed git status is treated like _check_remote_git_status does
+        status = status.strip() if success else ""
+        return is_git_repo, (bool(status), status)
+
+    def _check_remote_git_status(self, project):
         """Check if remote has uncommitted changes. Returns (has_changes, summary)"""
-        host = self.current_project['remote_host']
-        remote_path = self.current_project['remote_path']
+        host = project['remote_host']
+        remote_path = project['remote_path']
 
-        cmd = f'ssh -o ConnectTimeout=5 {host} "cd {remote_path} && git status --porcelain"'
-        success, output = self._run_command(cmd)
+        cmd = f"cd {_quote_remote_path(remote_path)} && git status --porcelain"
+        success, output = self._run_command(self._ssh(host, cmd, "-o", "ConnectTimeout=5"))
 
         if success:
             return bool(output.strip()), output.strip()
         return False, ""
 
-    def _git_pull_on_remote(self, skip_check=False):
-        """SSH to remote machine and run git pull (or clone if needed)"""
-        if not self.current_project:
-            return False
+    def _check_remote_is_git_repo(self, project):
+        """Check if the remote path is already a git repo"""
+        host = project['remote_host']
+        remote_path = project['remote_path']
 
-        host = self.current_project['remote_host']
-        remote_path = self.current_project['remote_path']
-        branch = self.current_project['git_branch']
-        local_path = self.current_project['local_path']
+        check_cmd = f"test -d {_quote_remote_path(remote_path + '/.git')} && echo yes || echo no"
+        success, output = self._run_command(self._ssh(host, check_cmd, "-o", "ConnectTimeout=5"))
+        return success and output.strip() == "yes"
 
-        # Check if remote path is a git repo
-        self._set_status("Checking if remote has git repo...", "blue")
-        self.update()
-        check_cmd = f'ssh -o ConnectTimeout=5 {host} "test -d {remote_path}/.git && echo yes || echo no"'
-        success, output = self._run_command(check_cmd)
+    def _git_pull_on_remote(self, project, skip_check=False, is_git_repo=None, remote_status=None):
+        """SSH to remote machine and run git pull (or clone if needed)
 
-        is_git_repo = success and output.strip() == "yes"
+        is_git_repo and remote_status take results already probed by the
+        caller (see _sync_to_remote_full) so they aren't fetched again.
+        """
+        host = project['remote_host']
+        remote_path = project['remote_path']
+        branch = project['git_branch']
+        local_path = project['local_path']
+
+        # Check if remote path is a git repo
+        if is_git_repo is None:
+            self._set_status("Checking if remote has git repo...", "blue")
+            is_git_repo = self._check_remote_is_git_repo(project)
 
         if not is_git_repo:
             # Need to set up git - get the origin URL from local repo
             self._set_status("Setting up git on remote...", "blue")
-            self.update()
 
-            success, origin_url = self._run_command("git remote get-url origin", cwd=local_path)
+            success, origin_url = self._run_command(["git", "remote", "get-url", "origin"], cwd=local_path)
             if not success or not origin_url.strip():
                 self._set_status("Setup failed - no origin URL", "red")
-                messagebox.showerror("Error",
+                self._ui(messagebox.showerror, "Error",
                     "Cannot set up remote: local repo has no 'origin' remote.\n\n"
                     "Please set up a git remote first:\n"
                     "  git remote add origin <url>")
@@ -805,22 +1524,30 @@ class SyncApp(tk.Tk):
             remote_url = self._convert_to_ssh_url(origin_url)
 
             # Check if directory exists
-            check_dir_cmd = f'ssh -o ConnectTimeout=5 {host} "test -d {remote_path} && echo yes || echo no"'
-            success, dir_exists = self._run_command(check_dir_cmd)
+            check_dir_cmd = f"test -d {_quote_remote_path(remote_path)} && echo yes || echo no"
+            success, dir_exists = self._run_command(self._ssh(host, check_dir_cmd, "-o", "ConnectTimeout=5"))
             dir_exists = success and dir_exists.strip() == "yes"
 
             if dir_exists:
                 # Directory exists but no git - init, add remote, fetch, reset
                 self._set_status("Initializing git in existing directory...", "blue")
-                self.update()
-                init_cmd = f'ssh {host} "cd {remote_path} && git init && git remote add origin {remote_url} && git fetch origin && git reset --hard origin/{branch}"'
-                success, output = self._run_command(init_cmd)
+                init_cmd = (f"cd {_quote_remote_path(remote_path)} && git init && "
+                            f"git remote add origin {shlex.quote(remote_url)} && git fetch origin && "
+                            f"git reset --hard {shlex.quote('origin/' + branch)}")
+                success, output = self._run_command_streaming(
+                    self._ssh(host, init_cmd), on_line=self._stream_to_status,
+                    timeout=NETWORK_TIMEOUT
+                )
             else:
                 # Directory doesn't exist - clone
                 self._set_status("Cloning repo to remote...", "blue")
-                self.update()
-                init_cmd = f'ssh {host} "mkdir -p $(dirname {remote_path}) && git clone {remote_url} {remote_path}"'
-                success, output = self._run_command(init_cmd)
+                quoted_path = _quote_remote_path(remote_path)
+                init_cmd = (f'mkdir -p "$(dirname {quoted_path})" && '
+                            f"git clone {shlex.quote(remote_url)} {quoted_path}")
+                success, output = self._run_command_streaming(
+                    self._ssh(host, init_cmd), on_line=self._stream_to_status,
+                    timeout=NETWORK_TIMEOUT
+                )
 
             if success:
                 self._set_status("Git set up on remote", "green")
@@ -829,21 +1556,22 @@ class SyncApp(tk.Tk):
                 self._set_status("Git setup failed", "red")
                 # Check for auth errors
                 if "username" in output.lower() or "authentication" in output.lower() or "credential" in output.lower():
-                    messagebox.showerror("GitHub Authentication Required",
+                    self._ui(messagebox.showerror, "GitHub Authentication Required",
                         f"The remote machine can't access GitHub.\n\n"
                         "Fix: Use SSH URL instead of HTTPS.\n\n"
                         "On your LOCAL machine, run:\n"
                         f"  git remote set-url origin git@github.com:USER/REPO.git\n\n"
                         "Then try syncing again.")
                 else:
-                    messagebox.showerror("Error", f"Failed to set up git on remote:\n{output}")
+                    self._ui(messagebox.showerror, "Error", f"Failed to set up git on remote:\n{output}")
                 return False
 
         # Remote has git repo - check for uncommitted changes
         if not skip_check:
-            self._set_status("Checking remote git status...", "blue")
-            self.update()
-            has_changes, summary = self._check_remote_git_status()
+            if remote_status is None:
+                self._set_status("Checking remote git status...", "blue")
+                remote_status = self._check_remote_git_status(project)
+            has_changes, summary = remote_status
 
             if has_changes:
                 lines = summary.split('\n')[:5]
@@ -851,7 +1579,7 @@ class SyncApp(tk.Tk):
                 if len(summary.split('\n')) > 5:
                     preview += f"\n... and {len(summary.split(chr(10))) - 5} more"
 
-                if not messagebox.askyesno("Warning: Uncommitted Changes on Remote",
+                if not self._ui(messagebox.askyesno, "Warning: Uncommitted Changes on Remote",
                     f"The remote machine has uncommitted git changes:\n\n{preview}\n\n"
                     "Running git pull may cause conflicts or lose work.\n\n"
                     "Continue anyway?"):
@@ -859,43 +1587,54 @@ class SyncApp(tk.Tk):
                     return False
 
         self._set_status("Running git pull on remote...", "blue")
-        self.update()
 
         # Remote uses SSH URL, so git pull uses SSH key auth
-        cmd = f'ssh {host} "cd {remote_path} && git pull origin {branch}"'
-        success, output = self._run_command(cmd)
+        cmd = f"cd {_quote_remote_path(remote_path)} && git pull origin {shlex.quote(branch)}"
+        success, output = self._run_command_streaming(
+            self._ssh(host, cmd), on_line=self._stream_to_status, timeout=NETWORK_TIMEOUT
+        )
 
         if success:
             self._set_status("Remote pull successful", "green")
             return True
         else:
             self._set_status("Remote pull failed", "red")
-            messagebox.showerror("Error", f"Remote git pull failed:\n{output}")
+            self._ui(messagebox.showerror, "Error", f"Remote git pull failed:\n{output}")
             return False
 
-    def _get_gitignored_files(self):
-        """Get list of local gitignored files that exist"""
-        cwd = self.current_project['local_path']
+    def _get_gitignored_files(self, project):
+        """Get list of local gitignored files that exist, as raw bytes paths
+
+        The listing is reused until `_invalidate_git_state` drops it at the
+        start of the next operation, so every step of one sync shares a
+        single `git ls-files`.
+        """
+        cwd = project['local_path']
+        cached = self._untracked_cache.get(cwd)
+        if cached is not None:
+            return cached
+
+        # NUL-separated so names with newlines survive; kept undecoded
+        # since rsync reads them back byte for byte
         success, output = self._run_command(
-            "git ls-files --others --ignored --exclude-standard",
-            cwd=cwd
+            ["git", "ls-files", "-z", "--others", "--ignored", "--exclude-standard"],
+            cwd=cwd, text=False
         )
 
-        if success and output:
-            return output.strip().split('\n')
-        return []
+        files = [f for f in output.split(b'\0') if f] if success else []
+        if success:
+            self._untracked_cache[cwd] = files
+        return files
 
-    def _sync_files_to_remote(self):
+    def _sync_files_to_remote(self, project, files=None):
         """Sync untracked/gitignored files to remote (skips newer files on remote)"""
-        if not self.current_project:
-            return False
-
-        cwd = self.current_project['local_path']
-        host = self.current_project['remote_host']
-        remote_path = self.current_project['remote_path']
+        cwd = project['local_path']
+        host = project['remote_host']
+        remote_path = project['remote_path']
 
         # Get files to sync
-        files = self._get_gitignored_files()
+        if files is None:
+            files = self._get_gitignored_files(project)
 
         if not files:
             self._set_status("No untracked files to sync", "gray")
@@ -903,70 +1642,150 @@ class SyncApp(tk.Tk):
 
         self._set_status("Syncing untracked files to remote...", "blue")
 
-        # Create a temp file with the list
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as tf:
-            tf.write('\n'.join(files))
-            temp_file = tf.name
-
-        try:
-            # -u flag skips files that are newer on destination
-            cmd = f'rsync -avzu --files-from="{temp_file}" "{cwd}/" "{host}:{remote_path}/"'
-            success, output = self._run_command(cmd)
+        # -u flag skips files that are newer on destination
+        if self._get_rsync_caps()['progress2']:
+            # One aggregate progress stream instead of a line per file, and
+            # the whole file list built up front in one pass
+            flags = ["-azu", "--info=progress2", "--no-inc-recursive"]
+        else:
+            flags = ["-avzu"]
+        # The file list goes straight to rsync's stdin, no temp file needed
+        cmd = ["rsync", *flags, "--partial", "-e", shlex.join(["ssh", *self._ssh_opts]),
+               f"--timeout={NETWORK_TIMEOUT}", "--files-from=-", "--from0",
+               f"{cwd}/", f"{host}:{remote_path}/"]
+        success, output = self._run_command_streaming(
+            cmd, on_line=self._stream_rsync_progress, input=b'\0'.join(files) + b'\0'
+        )
+        self._set_progress(None)
 
-            if success:
-                self._set_status(f"Synced {len(files)} files to remote", "green")
-                return True
-            else:
-                self._set_status("Sync failed", "red")
-                messagebox.showerror("Error", f"Sync failed:\n{output}")
-                return False
-        finally:
-            os.unlink(temp_file)
+        if success:
+            self._set_status(f"Synced {len(files)} files to remote", "green")
+            return True
+        else:
+            self._set_status("Sync failed", "red")
+            self._ui(messagebox.showerror, "Error", f"Sync failed:\n{output}")
+            return False
 
     def _sync_files_only(self):
         """Button handler: sync untracked files only"""
-        self._sync_files_to_remote()
+        if not self.current_project:
+            return
+
+        # Workers get their own copy, so editing or switching projects
+        # mid-operation can't redirect them
+        project = dict(self.current_project)
+        # Ignored files may have come and gone since the last click
+        self._invalidate_git_state(project['local_path'])
+
+        def work():
+            self._ensure_ssh_master(project['remote_host'])
+            return self._sync_files_to_remote(project)
+
+        self._run_in_thread(work)
 
     def _git_push_and_remote_pull(self):
         """Button handler: git push locally, then git pull on remote"""
         if not self.current_project:
             return
 
-        if not self._git_push_local():
-            return
+        project = dict(self.current_project)
+        # The worktree may have changed since the last click
+        self._invalidate_git_state(project['local_path'])
+
+        def work():
+            self._ensure_ssh_master(project['remote_host'])
+            # Local and remote status don't depend on each other - probe both at once
+            self._set_status("Checking local and remote git status...", "blue")
+            _, (is_git_repo, remote_status) = self._run_parallel(
+                lambda: self._get_git_state(project), lambda: self._probe_remote_repo(project)
+            )
+            return (self._git_push_local(project) and
+                    self._git_pull_on_remote(project, is_git_repo=is_git_repo, remote_status=remote_status))
 
-        self._git_pull_on_remote()
+        self._run_in_thread(work)
 
     def _sync_to_remote_full(self):
         """Full sync: push everything to remote so it matches this machine"""
         if not self.current_project:
             return
 
-        # Show busy cursor during sync
-        self.config(cursor="watch")
-        self._set_buttons_state(False)
-        self.update()
+        project = dict(self.current_project)
+        # The worktree may have changed since the last click
+        self._invalidate_git_state(project['local_path'])
+
+        def work():
+            self._ensure_ssh_master(project['remote_host'])
+            # Local and remote probes don't depend on each other, so run them
+            # side by side. Locally, one git status also lists the ignored files
+            # when it has to run at all; the state lands in _git_state_cache
+            # for _git_push_local.
+            def probe_local():
+                self._get_git_state(project, with_ignored=True)
+                return self._get_gitignored_files(project)
+
+            self._set_status("Checking local and remote state...", "blue")
+            files, (is_git_repo, remote_status) = self._run_parallel(
+                probe_local, lambda: self._probe_remote_repo(project)
+            )
 
-        try:
-            steps = [
-                ("Pushing git changes", self._git_push_local),
-                ("Setting up git on remote", self._git_pull_on_remote),
-                ("Syncing untracked files", self._sync_files_to_remote),
+            # Set once the commit prompt is settled; go says whether to carry on
+            committed = threading.Event()
+            go = []
+
+            def on_committed():
+                go.append(True)
+                committed.set()
+
+            git_steps = [
+                ("Pushing git changes", lambda: self._git_push_local(project, on_committed)),
+                ("Setting up git on remote",
+                 lambda: self._git_pull_on_remote(project, is_git_repo=is_git_repo,
+                                                  remote_status=remote_status)),
             ]
+            files_step = ("Syncing untracked files", lambda: self._sync_files_to_remote(project, files))
+
+            def run_steps(steps):
+                """Run steps in order; return the name of the one that failed, or None"""
+                for step_name, step_func in steps:
+                    self._set_status(step_name + "...", "blue")
+                    if not step_func():
+                        return step_name
+                return None
+
+            if is_git_repo:
+                # Remote checkout already exists, so the push/pull chain only
+                # touches tracked files and rsync only ignored ones - overlap them.
+                # (A fresh clone needs the directory to itself, so that case
+                # stays sequential.) The upload waits for the commit prompt,
+                # so cancelling the commit still stops the whole sync.
+                def run_git():
+                    try:
+                        return run_steps(git_steps)
+                    finally:
+                        committed.set()
+
+                def run_files():
+                    committed.wait()
+                    return run_steps([files_step]) if go else None
+
+                results = self._run_parallel(run_git, run_files)
+            else:
+                results = [run_steps(git_steps + [files_step])]
 
-            for step_name, step_func in steps:
-                self._set_status(step_name + "...", "blue")
-                self.update()  # Force UI update before blocking call
-                if not step_func():
-                    self._set_status(f"Sync stopped at: {step_name}", "orange")
-                    return
+            # Both chains report as they go, so settle the status line only
+            # once everything has finished
+            stopped = [name for name in results if name]
+            if stopped:
+                self._set_status(f"Sync stopped at: {' and '.join(stopped)}", "orange")
+                return False
+            return True
 
-            self._set_status("Sync complete! Remote matches this machine.", "green")
-            messagebox.showinfo("Success", "Remote machine now matches this machine!")
-        finally:
-            self.config(cursor="")
-            self._set_buttons_state(True)
+        def done(result):
+            if result:
+                self._set_status("Sync complete! Remote matches this machine.", "green")
+                messagebox.showinfo("Success", "Remote machine now matches this machine!")
+
+        self._run_in_thread(work, done)
 
 
 def main():